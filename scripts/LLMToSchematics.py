@@ -15,15 +15,14 @@ from langchain_core.runnables import chain
 import base64
 from langchain_core.output_parsers import JsonOutputParser
 
-import yaml
 import os
+from scripts.config import read_config
 
 # Path to your config.yaml file
 config_file_path = 'configuration.yaml'
 
 # Read the YAML file
-with open(config_file_path, 'r') as file:
-    config = yaml.safe_load(file)
+config = read_config(config_file_path)
 
 # Extract the OPENAI_API_KEY value
 openai_api_key = config.get('OPENAI_API_KEY', None)
@@ -0,0 +1,31 @@
+# Reads the configuration.yaml file shared by the scripts
+
+import functools
+import os
+import yaml
+
+# Use the libyaml C loader when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def read_config(file_path):
+    """
+    Read contents from the configuration.yaml file.
+    The parsed result is cached until the file is modified.
+
+    Parameters:
+    file_path (str): Path to the configuration file
+
+    Returns:
+    dict: A dictionary containing the configuration values
+    """
+
+    return _read_config_cached(file_path, os.stat(file_path).st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=8)
+def _read_config_cached(file_path, mtime_ns):
+    # mtime_ns is only part of the cache key, so an edited file is parsed again
+    with open(file_path, 'rb') as file:
+        config = yaml.load(file, Loader=_YAML_LOADER)
+    return config
@@ -68,19 +68,19 @@ def scale_components_in_relative_coordinates(components, scaling_factor):
 
 
 
+# Raw component names (as returned by the model) with a known lib_id
+_LIB_ID_MAP = {
+    "resistor": "Device:R", "R": "Device:R", "Resistor": "Device:R",
+    "capacitor": "Device:C", "C": "Device:C", "C_Small": "Device:C",
+    "battery": "Device:Battery", "cell": "Device:Battery", "BAT": "Device:Battery",
+    "led": "Device:LED", "LED": "Device:LED",
+    "switch": "Switch:SW_SPST", "SW": "Switch:SW_SPST", "switch_spst": "Switch:SW_SPST",
+}
+
+
 def match_libId(raw_libid: str):
-    lib_id = raw_libid
-    if raw_libid == "resistor" or raw_libid == "R" or raw_libid== "Resistor":
-        lib_id = "Device:R"
-    elif raw_libid == "capacitor" or raw_libid == "C" or raw_libid == "C_Small":
-        lib_id = "Device:C"
-    elif "battery" == raw_libid or "cell" == raw_libid or "BAT" == raw_libid:
-        lib_id = "Device:Battery"
-    elif "led" == raw_libid or "LED" == raw_libid:
-        lib_id = "Device:LED"
-    elif "switch" == raw_libid or "SW" == raw_libid or "switch_spst" == raw_libid:
-        lib_id = "Switch:SW_SPST"
-    else:
+    lib_id = _LIB_ID_MAP.get(raw_libid)
+    if lib_id is None:
         lib_id = symbol_search.find_closest_matches(raw_libid)[0]
 
     return lib_id
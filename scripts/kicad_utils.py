@@ -24,24 +24,12 @@
 #       Conversion ratio of co-ordinates = eeschema/kicad_sch = 8250/209.55 = 39.3700787402
 #       With internal padding, top left corner is (600,600) in eeschema or (15.24,15.24) in kicad_sch
 
-import uuid
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
 import os
-import yaml
 
-def read_config(file_path):
-    """
-    Read contents from the configuration.yaml file
-
-    Parameters:
-    file_path (str): Path to the configuration file
-
-    Returns:
-    dict: A dictionary containing the configuration values
-    """
-
-    with open(file_path, 'r') as file:
-        config = yaml.safe_load(file)
-    return config
+from scripts.config import read_config
 
 
 # Path to the configuration file
@@ -53,10 +41,55 @@ config = read_config(config_file_path)
 # Get the symbol library path from the configuration and expand the user path
 PATH_TO_SYMBOL_LIBRARY = os.path.expanduser(config['symbol_library_path'])
 
+# Cache of symbol library files, keyed by path:
+#   (mtime, content, {symbol_name: (start, end)}, {lib_id: (symbol_def_string, value, description)})
+# The symbol index is built in one pass when the file is loaded, so looking up a symbol is a dict hit.
+# The resolved symbols are filled lazily and dropped with the rest of the entry when the file changes.
+_LIB_CACHE = {}
+
+# Matches the parentheses of an s-expression, used to find where a subsection ends.
+# Quoted strings are matched as a whole so the parentheses inside them are skipped.
+_PAREN_RE = re.compile(r'[()]|"(?:[^"\\]|\\.)*"')
+
+# Matches the Value and Description properties of a symbol definition in one pass
+_PROPERTY_RE = re.compile(r'\(property "(Value|Description)" "([^"]*)"')
+
+# Number of uuids drawn at once by SchematicBuilder
+_UUID_BLOCK_SIZE = 256
+
+
+def _fresh_uuids(n):
+    """
+    Generate n random (version 4) uuid strings from a single os.urandom call.
+
+    Parameters:
+        n (int): Number of uuids to generate.
+
+    Returns:
+        list: A list of uuid strings.
+    """
+    raw = bytearray(os.urandom(16 * n))
+    for i in range(0, 16 * n, 16):
+        raw[i + 6] = (raw[i + 6] & 0x0f) | 0x40  # version 4
+        raw[i + 8] = (raw[i + 8] & 0x3f) | 0x80  # RFC 4122 variant
+    h = raw.hex()
+    return [f"{h[i:i+8]}-{h[i+8:i+12]}-{h[i+12:i+16]}-{h[i+16:i+20]}-{h[i+20:i+32]}"
+            for i in range(0, 32 * n, 32)]
+
+
+def _u4():
+    """
+    Generate a single random (version 4) uuid string, without building a uuid.UUID object.
+
+    Returns:
+        str: The uuid string.
+    """
+    return _fresh_uuids(1)[0]
+
 
 
 def create_empty_kicad_sch_template():
-    file_uuid = f"{uuid.uuid4()}"
+    file_uuid = _u4()
     template = f"""(kicad_sch
     (version 20231120)
     (generator "SidYifanOmarNeel")
@@ -105,17 +138,105 @@ def extract_subsection(content, subsection):
         return None  # Symbol not found
 
     balance = 0  # Track the balance of parentheses
-    for i in range(subsection_start, len(content)):
-        if content[i] == '(':
+    # Only visit the parentheses instead of every character
+    for match in _PAREN_RE.finditer(content, subsection_start):
+        token = match.group()
+        if token == '(':
             balance += 1
-        elif content[i] == ')':
+        elif token == ')':
             balance -= 1
 
-        if balance == 0:
-            subsection_end = i + 1
-            return [subsection_start, subsection_end, content[subsection_start:subsection_end]]
+            if balance == 0:
+                subsection_end = match.end()
+                return [subsection_start, subsection_end, content[subsection_start:subsection_end]]
     return None
 
+
+def index_symbols(lib_file_content):
+    """
+    Index the top level symbol definitions of a .kicad_sym file (or of a lib_symbols section) in a single pass.
+
+    Parameters:
+        lib_file_content (str): The content of the symbol library file.
+
+    Returns:
+        dict: A dictionary mapping each symbol name to the start and end index of its definition.
+    """
+    symbols = {}
+    depth = 0
+    symbol_name = None
+    symbol_start = 0
+    for match in _PAREN_RE.finditer(lib_file_content):
+        token = match.group()
+        if token == '(':
+            depth += 1
+            # Symbols are the direct children of (kicad_symbol_lib ...) or (lib_symbols ...)
+            if depth == 2 and lib_file_content.startswith('(symbol "', match.start()):
+                symbol_start = match.start()
+                name_start = symbol_start + len('(symbol "')
+                symbol_name = lib_file_content[name_start:lib_file_content.find('"', name_start)]
+        elif token == ')':
+            depth -= 1
+            if depth == 1 and symbol_name is not None:
+                symbols.setdefault(symbol_name, (symbol_start, match.end()))
+                symbol_name = None
+    return symbols
+
+
+def load_symbol_library(path_to_lib_kicad_sym_file):
+    """
+    Load a .kicad_sym file, reusing the cached content if the file has not changed on disk.
+
+    Parameters:
+        path_to_lib_kicad_sym_file (str): Path to the symbol library file.
+
+    Returns:
+        tuple: (content, symbols) where symbols maps symbol names to the start and end index of their definition.
+    """
+    cached = _load_library_entry(path_to_lib_kicad_sym_file)
+    return cached[1], cached[2]
+
+
+def _load_library_entry(path_to_lib_kicad_sym_file):
+    # Returns the whole _LIB_CACHE entry of the file, reloading it if the file changed
+    mtime = os.stat(path_to_lib_kicad_sym_file).st_mtime
+    cached = _LIB_CACHE.get(path_to_lib_kicad_sym_file)
+    if cached is None or cached[0] != mtime:
+        with open(path_to_lib_kicad_sym_file, 'r') as file:
+            lib_file_content = file.read()
+        cached = (mtime, lib_file_content, index_symbols(lib_file_content), {})
+        _LIB_CACHE[path_to_lib_kicad_sym_file] = cached
+    return cached
+
+
+def _symbol_library_path(lib_id):
+    lib_name = lib_id.split(":")[0]  # Eg: Device
+    # Import Library Symbols Definitions
+    # This file is the reference which defines the properties of each component
+    return f"{PATH_TO_SYMBOL_LIBRARY}{lib_name}.kicad_sym"
+
+
+def find_library_symbol(lib_id):
+    """
+    Find the subsection of a symbol in its symbol library file based on the given lib_id.
+
+    Parameters:
+        lib_id (str): The lib_id of the symbol. Eg: Device:Battery_Cell
+
+    Returns:
+        list: A list containing the start index, end index, and the symbol definition in the library file.
+    """
+    symbol_name = lib_id.split(":")[1]  # Eg: Battery_Cell
+    path_to_lib_kicad_sym_file = _symbol_library_path(lib_id)
+
+    lib_file_content, symbols = load_symbol_library(path_to_lib_kicad_sym_file)
+    if symbol_name not in symbols:
+        raise Exception(
+            f"Symbol {symbol_name} not found in {path_to_lib_kicad_sym_file}")
+
+    symbol_start, symbol_end = symbols[symbol_name]
+    return [symbol_start, symbol_end, lib_file_content[symbol_start:symbol_end]]
+
 # Extracts string which is the definition symbol template from Device.kicad_sym file
 
 
@@ -130,26 +251,40 @@ def extract_symbol_definition(lib_id):
         str: The symbol definition string.
     """
 
-    lib_name = lib_id.split(":")[0]  # Eg: Device
     symbol_name = lib_id.split(":")[1]  # Eg: Battery_Cell
-    # Import Library Symbols Definitions
-    # This file is the reference which defines the properties of each component
-    path_to_lib_kicad_sym_file = f"{PATH_TO_SYMBOL_LIBRARY}{lib_name}.kicad_sym"
-
-    # Read the symbol definition from the device file
-    with open(path_to_lib_kicad_sym_file, 'r') as file:
-        lib_file_content = file.read()
-
-    subsection = extract_subsection(
-        lib_file_content, f'(symbol "{symbol_name}"')
-    if subsection is not None:
-        symbol_def_string = subsection[2]
-        symbol_def_string = symbol_def_string.replace(
-            f'(symbol "{symbol_name}"', f'(symbol "{lib_id}"')
-        return symbol_def_string
-    else:
-        raise Exception(
-            f"Symbol {symbol_name} not found in {path_to_lib_kicad_sym_file}")
+    symbol_def_string = find_library_symbol(lib_id)[2]
+    symbol_def_string = symbol_def_string.replace(
+        f'(symbol "{symbol_name}"', f'(symbol "{lib_id}"', 1)
+    return symbol_def_string
+
+
+def _resolve_lib_id(lib_id):
+    """
+    Resolve a lib_id to its symbol definition and default properties, once per lib_id
+    and version of its symbol library file.
+
+    Parameters:
+        lib_id (str): The lib_id of the symbol. Eg: Device:Battery_Cell
+
+    Returns:
+        tuple: (symbol_def_string, value, description)
+    """
+    path_to_lib_kicad_sym_file = _symbol_library_path(lib_id)
+    # Content, index and resolved symbols all come from the same version of the file
+    _, lib_file_content, symbols, resolved = _load_library_entry(path_to_lib_kicad_sym_file)
+    if lib_id not in resolved:
+        symbol_name = lib_id.split(":")[1]  # Eg: Battery_Cell
+        if symbol_name not in symbols:
+            raise Exception(
+                f"Symbol {symbol_name} not found in {path_to_lib_kicad_sym_file}")
+        symbol_start, symbol_end = symbols[symbol_name]
+        symbol_def_string = lib_file_content[symbol_start:symbol_end].replace(
+            f'(symbol "{symbol_name}"', f'(symbol "{lib_id}"', 1)
+        properties = {}
+        for property_name, property_value in _PROPERTY_RE.findall(symbol_def_string):
+            properties.setdefault(property_name, property_value)
+        resolved[lib_id] = (symbol_def_string, properties.get("Value", ""), properties.get("Description", ""))
+    return resolved[lib_id]
 
 
 def extract_property_value(subsection, property_name):
@@ -219,25 +354,9 @@ def count_pins_in_symbol(lib_id):
     Returns:
         int: The number of pins in the symbol.
     """
-    lib_name = lib_id.split(":")[0]  # Eg: Device
-    symbol_name = lib_id.split(":")[1]  # Eg: Battery_Cell
-    # Import Library Symbols Definitions
-    # This file is the reference which defines the properties of each component
-    path_to_lib_kicad_sym_file = f"{PATH_TO_SYMBOL_LIBRARY}{lib_name}.kicad_sym"
-
-    # Read the symbol definition from the device file
-    with open(path_to_lib_kicad_sym_file, 'r') as file:
-        lib_file_content = file.read()
-
-    subsection = extract_subsection(
-        lib_file_content, f'(symbol "{symbol_name}"')
-    if subsection is not None:
-        symbol_def_string = subsection[2]
-        pin_count = symbol_def_string.count("(pin ")
-        return pin_count
-    else:
-        raise Exception(
-            f"Symbol {symbol_name} not found in {path_to_lib_kicad_sym_file}")
+    symbol_def_string = find_library_symbol(lib_id)[2]
+    pin_count = symbol_def_string.count("(pin ")
+    return pin_count
 
 def find_justification(symbol_library):
     
@@ -266,110 +385,39 @@ def find_justification(symbol_library):
         return None
 
 
-def add_component_to_kicad_sch_file(kicad_sch_file, component_dict):
-    # if symbol for component is not lib_symbol, add it
-    libSymbols = extract_subsection(kicad_sch_file, '(lib_symbols')
-    if libSymbols[2].find(f'component_dict["lib_id"]"') == -1:
-        libSymbols_insert_point = libSymbols[0] + len('(lib_symbols')
-        kicad_sch_file = kicad_sch_file[:libSymbols_insert_point] + \
-            f"\n {extract_symbol_definition(component_dict['lib_id'])} \n " + \
-            kicad_sch_file[libSymbols_insert_point:]
-
-    # add symbol string
-    curr_lib_id = component_dict["lib_id"]
-    
-    # lib_name = component_dict["lib_id"].split(":")[0] #Eg: Device
-    # symbol_name = component_dict["lib_id"].split(":")[1] #Eg: Battery_Cell
-
-    # get file uuid to add to instance section in the bottom of the file
-    uuid_section = extract_subsection(kicad_sch_file, '(uuid')
-    if uuid_section:
-        # Extract the UUID value
-        start = uuid_section[2].find('"') + 1  # Find the first quotation mark
-        # Find the second quotation mark
-        end = uuid_section[2].find('"', start)
-        uuid_value = uuid_section[2][start:end]
-
-    # get symbol value from lib_symbols
-    libSymbols = extract_subsection(kicad_sch_file, '(lib_symbols')
-    if libSymbols is None:
-        print("lib_symbols not found")
-        raise Exception("lib_symbols not found")
-
-    symbol_section = extract_subsection(
-        libSymbols[2], f'(symbol "{curr_lib_id}"')
-    if symbol_section is None:
-        # print("symbol_section? not found")
-        raise Exception(f'symbol_section (symbol "{curr_lib_id}" not found')
-
-    refCord = list(extract_property_coordinates(symbol_section[2], "Reference"))
-    valueCord = list(extract_property_coordinates(symbol_section[2], "Value"))
-    justify = find_justification(symbol_section[2])
-
-    y_offset = refCord[1]-valueCord[1] # offset between reference and value
-    y_offset = 1.7
-
-    if component_dict["angle"] != 0:
-        xs = abs(refCord[0]) + 2.54
-        refCord[1] = round(component_dict["y"]-y_offset-xs,2)
-        refCord[0] = round(component_dict["x"],2)
-        valueCord[1] = round(component_dict["y"]- xs,2)
-        valueCord[0] = round(component_dict["x"],2)
-        justify = None
-    else:
-        refCord[0] = round(refCord[0]+component_dict["x"],2) + 0.5
-        refCord[1] = round(refCord[1]+component_dict["y"],2)
-        valueCord[0] = round(valueCord[0]+component_dict["x"],2)
-        valueCord[1] = round(valueCord[1]+component_dict["y"],2)
-
-    description = extract_property_value(symbol_section[2], "Description")
-
-    # get symbol description from lib_symbols
-    property_value = extract_property_value(symbol_section[2], "Value")
-    
-    # If no value is provided, use the default value from the symbol library
-    if "value" not in component_dict:
-        component_dict["value"] = property_value
-
-    # create a pin list for the symbol
-    pin_count = symbol_section[2].count("(pin ")
-    pin_uuid_list = ""
-    for i in range(pin_count): 
-        pin_uuid_list+=(f"(pin \"{i}\" (uuid {uuid.uuid4()})) \n")
-
-    # TODO: set "at" of each property value = parsed_x + lib_symbol_property_x
-    # Currently adding 2 pins to all components. TODO: Check lib-symbols for number of pins and add accordingly.
-    symbol_instance = f"""
+# Templates of the symbol and wire instances, formatted with a dict of their fields
+# TODO: set "at" of each property value = parsed_x + lib_symbol_property_x
+_SYMBOL_TEMPLATE = """
 (symbol
-        (lib_id "{component_dict["lib_id"]}")
-        (at {component_dict["x"]} {component_dict["y"]} {component_dict["angle"]})
+        (lib_id "{lib_id}")
+        (at {x} {y} {angle})
         (unit 1)
         (exclude_from_sim no)
         (in_bom yes)
         (on_board yes)
         (dnp no)
         (fields_autoplaced yes)
-        (uuid "{uuid.uuid4()}")
-        (property "Reference" "{component_dict["reference_name"]}"
-            (at {refCord[0]} {refCord[1]} {component_dict["angle"]})
+        (uuid "{inst_uuid}")
+        (property "Reference" "{ref}"
+            (at {ref_x} {ref_y} {angle})
             (effects
                 (font
                     (size 1.27 1.27)
                 )
-                {"" if justify is None else f'(justify {justify})'}
+                {justify}
             )
         )
-        (property "Value" "{component_dict["value"]}"
-            (at {valueCord[0]} {valueCord[1]} {component_dict["angle"]})
+        (property "Value" "{value}"
+            (at {value_x} {value_y} {angle})
             (effects
                 (font
                     (size 1.27 1.27)
                 )
-                {"" if justify is None else f'(justify {justify})'}
+                {justify}
             )
         )
         (property "Footprint" ""
-            (at {component_dict["x"]} {component_dict["y"]} {component_dict["angle"]})
+            (at {x} {y} {angle})
             (effects
                 (font
                     (size 1.27 1.27)
@@ -399,23 +447,306 @@ def add_component_to_kicad_sch_file(kicad_sch_file, component_dict):
         {pin_uuid_list}
 
         (instances
-            (project "temp_{uuid_value}"
-                (path "/{uuid_value}"
-                    (reference "{component_dict["reference_name"]}")
+            (project "temp_{file_uuid}"
+                (path "/{file_uuid}"
+                    (reference "{ref}")
                     (unit 1)
                 )
             )
         )
     )    
-"""
+""".format_map
+
+_WIRE_TEMPLATE = """(wire
+		(pts
+			(xy {x} {y}) (xy {end_x} {end_y})
+		)
+		(stroke
+			(width 0)
+			(type default)
+		)
+		(uuid "{wire_uuid}")
+	)""".format_map
+
+
+def render_component_instance(component_dict, symbol_def_string, value, description, file_uuid, uuids=None):
+    """
+    Render the (symbol ...) instance of a component without touching the schematic.
+
+    Parameters:
+        component_dict (dict): A dictionary representing the component to be rendered.
+            Example: {"lib_id": "Device:Ammeter_AC", "x": 133.35, "y": 64.77, "angle": 0, "reference_name": "BT1"}
+        symbol_def_string (str): The lib_symbols definition of the component's symbol.
+        value (str): The default Value property of the symbol, used if component_dict has no "value".
+        description (str): The Description property of the symbol.
+        file_uuid (str): The uuid of the schematic file the instance belongs to.
+        uuids (list of str, optional): One uuid for the instance followed by one per pin of the symbol.
+            If not provided, new uuids are generated.
 
-    libSymbols = extract_subsection(kicad_sch_file, '(lib_symbols')
-    symbol_insert_point = libSymbols[1] + 1
-    # print(f" the value of symbol_insert_point is {symbol_insert_point}")
-    kicad_sch_file = kicad_sch_file[:symbol_insert_point] + \
-        f"\n {symbol_instance} \n " + kicad_sch_file[symbol_insert_point:]
-    # print(kicad_sch_file)
-    return kicad_sch_file
+    Returns:
+        str: The symbol instance string.
+    """
+    refCord = list(extract_property_coordinates(symbol_def_string, "Reference"))
+    valueCord = list(extract_property_coordinates(symbol_def_string, "Value"))
+    justify = find_justification(symbol_def_string)
+
+    y_offset = refCord[1]-valueCord[1] # offset between reference and value
+    y_offset = 1.7
+
+    if component_dict["angle"] != 0:
+        xs = abs(refCord[0]) + 2.54
+        refCord[1] = round(component_dict["y"]-y_offset-xs,2)
+        refCord[0] = round(component_dict["x"],2)
+        valueCord[1] = round(component_dict["y"]- xs,2)
+        valueCord[0] = round(component_dict["x"],2)
+        justify = None
+    else:
+        refCord[0] = round(refCord[0]+component_dict["x"],2) + 0.5
+        refCord[1] = round(refCord[1]+component_dict["y"],2)
+        valueCord[0] = round(valueCord[0]+component_dict["x"],2)
+        valueCord[1] = round(valueCord[1]+component_dict["y"],2)
+
+    # If no value is provided, use the default value from the symbol library
+    value = component_dict.get("value", value)
+
+    # create a pin list for the symbol
+    pin_count = symbol_def_string.count("(pin ")
+    if uuids is None:
+        uuids = _fresh_uuids(pin_count + 1)
+    pin_uuid_list = "".join(f"(pin \"{i}\" (uuid {uuids[i + 1]})) \n" for i in range(pin_count))
+
+    symbol_instance = _SYMBOL_TEMPLATE({
+        "lib_id": component_dict["lib_id"],
+        "x": component_dict["x"],
+        "y": component_dict["y"],
+        "angle": component_dict["angle"],
+        "ref": component_dict["reference_name"],
+        "ref_x": refCord[0],
+        "ref_y": refCord[1],
+        "value": value,
+        "value_x": valueCord[0],
+        "value_y": valueCord[1],
+        "justify": "" if justify is None else f'(justify {justify})',
+        "description": description,
+        "pin_uuid_list": pin_uuid_list,
+        "inst_uuid": uuids[0],
+        "file_uuid": file_uuid,
+    })
+    return symbol_instance
+
+
+def render_wire_instance(wire_dict, wire_uuid=None):
+    """
+    Render the (wire ...) instance of a wire without touching the schematic.
+
+    Parameters:
+        wire_dict (dict): A dictionary representing the wire.
+            Example: {"x": 148.59, "y": 77.47, "end_x": 157.48, "end_y": 77.47}
+        wire_uuid (str, optional): The uuid of the wire. If not provided, a new uuid is generated.
+
+    Returns:
+        str: The wire instance string.
+    """
+    if wire_uuid is None:
+        wire_uuid = _u4()
+    wire_template = _WIRE_TEMPLATE({
+        "x": wire_dict['x'],
+        "y": wire_dict['y'],
+        "end_x": wire_dict['end_x'],
+        "end_y": wire_dict['end_y'],
+        "wire_uuid": wire_uuid,
+    })
+    return wire_template
+
+
+# Number of elements from which rendering is spread over worker processes, if there is more than one core.
+# An element renders serially in about 30 us, while starting a spawn pool of 4 workers takes about 0.45 s,
+# so below this the pool costs more than it saves.
+_PARALLEL_THRESHOLD = 20000
+
+# Resolved symbols and file uuid of the schematic being rendered, set in each worker by _init_render_worker
+_worker_symbols = {}
+_worker_file_uuid = None
+
+
+def _init_render_worker(symbols, file_uuid):
+    global _worker_symbols, _worker_file_uuid
+    _worker_symbols = symbols
+    _worker_file_uuid = file_uuid
+
+
+def _render_component(component_dict):
+    symbol_def_string, value, description = _worker_symbols[component_dict["lib_id"]]
+    return render_component_instance(
+        component_dict, symbol_def_string, value, description, _worker_file_uuid)
+
+
+def _render_wire(wire_dict):
+    return render_wire_instance(wire_dict)
+
+
+class SchematicBuilder:
+    """
+    In-memory kicad_sch file. Components and wires are rendered as they are added
+    and the file content is only assembled once, by render().
+
+    Parameters:
+        kicad_sch_file (str, optional): The content of an existing KiCad schematic file to add to.
+            If not provided, an empty schematic is used.
+    """
+
+    def __init__(self, kicad_sch_file=None):
+        if kicad_sch_file is None:
+            kicad_sch_file = create_empty_kicad_sch_template()
+
+        # Scan the file once for the file uuid and the points where new elements are inserted
+        libSymbols = extract_subsection(kicad_sch_file, '(lib_symbols')
+        if libSymbols is None:
+            raise Exception("lib_symbols not found")
+        libSymbols_insert_point = libSymbols[0] + len('(lib_symbols')
+
+        self.file_uuid = None
+        uuid_section = extract_subsection(kicad_sch_file, '(uuid')
+        if uuid_section:
+            # Extract the UUID value
+            start = uuid_section[2].find('"') + 1  # Find the first quotation mark
+            # Find the second quotation mark
+            end = uuid_section[2].find('"', start)
+            self.file_uuid = uuid_section[2][start:end]
+
+        # The file is kept as three fixed segments, new elements go in between them
+        self._head = kicad_sch_file[:libSymbols_insert_point]
+        self._lib_symbols_body = kicad_sch_file[libSymbols_insert_point:libSymbols[1]]
+        self._tail = kicad_sch_file[libSymbols[1]:]
+
+        self.lib_symbols = {}  # lib_id -> symbol definition added to lib_symbols
+        self.symbols = []
+        self.wires = []
+        # lib_ids already defined in lib_symbols, including the ones of an existing file
+        self._lib_ids = set(index_symbols(libSymbols[2]))
+        # Pool of pre-generated uuids, refilled a block at a time
+        self._uuids = []
+
+    def _take_uuids(self, n):
+        if len(self._uuids) < n:
+            self._uuids.extend(_fresh_uuids(max(n, _UUID_BLOCK_SIZE)))
+        taken = self._uuids[-n:]
+        del self._uuids[-n:]
+        return taken
+
+    def add_component(self, component_dict):
+        """
+        Add a component to the schematic.
+
+        Parameters:
+            component_dict (dict): A dictionary representing the component to be added to the schematic.
+                Example: {"lib_id": "Device:Ammeter_AC", "x": 133.35, "y": 64.77, "angle": 0, "reference_name": "BT1"}
+        """
+        lib_id = component_dict["lib_id"]
+        symbol_def_string, value, description = self._add_lib_symbol(lib_id)
+
+        uuids = self._take_uuids(symbol_def_string.count("(pin ") + 1)
+        self.symbols.append(render_component_instance(
+            component_dict, symbol_def_string, value, description, self.file_uuid, uuids))
+
+    def _add_lib_symbol(self, lib_id):
+        symbol_def_string, value, description = _resolve_lib_id(lib_id)
+        # if symbol for component is not lib_symbol, add it
+        if lib_id not in self._lib_ids:
+            self._lib_ids.add(lib_id)
+            self.lib_symbols[lib_id] = symbol_def_string
+        return symbol_def_string, value, description
+
+    def add_wire(self, wire_dict):
+        """
+        Add a wire to the schematic.
+
+        Parameters:
+            wire_dict (dict): A dictionary representing the wire to be added to the schematic.
+                Example: {"x": 148.59, "y": 77.47, "end_x": 157.48, "end_y": 77.47}
+        """
+        self.wires.append(render_wire_instance(wire_dict, self._take_uuids(1)[0]))
+
+    def add_elements(self, components=(), wires=()):
+        """
+        Add several components and wires to the schematic. For large schematics on machines with
+        more than one core, the instances are rendered in worker processes sharing one pool.
+
+        Parameters:
+            components (list of dicts, optional): A list of dictionaries representing the components to be added.
+            wires (list of dicts, optional): A list of dictionaries representing the wires to be added.
+        """
+        if len(components) + len(wires) < _PARALLEL_THRESHOLD or (os.cpu_count() or 1) < 2:
+            for component in components:
+                self.add_component(component)
+            for wire in wires:
+                self.add_wire(wire)
+            return
+
+        # Resolve every symbol once here, so the workers only format strings
+        symbols = {}
+        for component in components:
+            lib_id = component["lib_id"]
+            if lib_id not in symbols:
+                symbols[lib_id] = self._add_lib_symbol(lib_id)
+
+        # Spawn the workers instead of forking, the caller (eg: the GUI) may be running other threads
+        with ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_render_worker,
+                                 initargs=(symbols, self.file_uuid)) as executor:
+            # Both maps are submitted before collecting, so wires render while components finish
+            rendered_symbols = executor.map(_render_component, components, chunksize=64)
+            rendered_wires = executor.map(_render_wire, wires, chunksize=64)
+            self.symbols.extend(rendered_symbols)
+            self.wires.extend(rendered_wires)
+
+    def _chunks(self):
+        # The file content in order, new lib symbols first, then the new symbols and wires
+        yield self._head
+        for part in self.lib_symbols.values():
+            yield f"\n {part} \n "
+        yield self._lib_symbols_body
+        for part in self.symbols:
+            yield f"\n {part} \n "
+        for part in self.wires:
+            yield f"\n {part} \n "
+        yield self._tail
+
+    def render(self):
+        """
+        Assemble the KiCad schematic file content.
+
+        Returns:
+            str: The KiCad schematic file content.
+        """
+        return "".join(self._chunks())
+
+    def write(self, file):
+        """
+        Write the KiCad schematic file content chunk by chunk, without assembling it in memory.
+
+        Parameters:
+            file (file object): A file opened for writing in text mode.
+        """
+        for chunk in self._chunks():
+            file.write(chunk)
+
+
+def add_component_to_kicad_sch_file(kicad_sch_file, component_dict):
+    """
+    Add a component to a KiCad schematic file.
+
+    Parameters:
+        kicad_sch_file (str): The content of the KiCad schematic file.
+        component_dict (dict): A dictionary representing the component to be added to the schematic.
+            Example: {"lib_id": "Device:Ammeter_AC", "x": 133.35, "y": 64.77, "angle": 0, "reference_name": "BT1"}
+
+    Returns:
+        str: The modified KiCad schematic file content.
+    """
+    builder = SchematicBuilder(kicad_sch_file)
+    builder.add_component(component_dict)
+    return builder.render()
 
 
 def add_wire_to_kicad_sch_file(kicad_sch_file, wire_dict):
@@ -431,21 +762,9 @@ def add_wire_to_kicad_sch_file(kicad_sch_file, wire_dict):
     Returns:
         str: The modified KiCad schematic file content.
     """
-    wire_template = f"""(wire
-		(pts
-			(xy {wire_dict['x']} {wire_dict['y']}) (xy {wire_dict['end_x']} {wire_dict['end_y']})
-		)
-		(stroke
-			(width 0)
-			(type default)
-		)
-		(uuid "{uuid.uuid4()}")
-	)"""
-    libSymbols = extract_subsection(kicad_sch_file, '(lib_symbols')
-    symbol_insert_point = libSymbols[1] + 1
-    kicad_sch_file = kicad_sch_file[:symbol_insert_point] + \
-        f"\n {wire_template} \n " + kicad_sch_file[symbol_insert_point:]
-    return kicad_sch_file
+    builder = SchematicBuilder(kicad_sch_file)
+    builder.add_wire(wire_dict)
+    return builder.render()
 
 
 def create_kicad_sch_file(components=None, wires=None, new_file_name=None):
@@ -470,24 +789,18 @@ def create_kicad_sch_file(components=None, wires=None, new_file_name=None):
         wires = []
 
     # create empty kicad_sch file
-    temp_kicad_sch_file = create_empty_kicad_sch_template()
+    builder = SchematicBuilder()
 
     # add each element to kicad_file
-    for component in components:
-        temp_kicad_sch_file = add_component_to_kicad_sch_file(
-            temp_kicad_sch_file, component)
-
-    for wire in wires:
-        temp_kicad_sch_file = add_wire_to_kicad_sch_file(
-            temp_kicad_sch_file, wire)
+    builder.add_elements(components, wires)
 
     # save temp file
     if new_file_name is not None:
         file_path = new_file_name + ".kicad_sch"
     else:
-        file_path = f'temp_{uuid.uuid4()}.kicad_sch'
-    with open(file_path, 'w') as file:
-        file.write(temp_kicad_sch_file)
+        file_path = f'temp_{_u4()}.kicad_sch'
+    with open(file_path, 'w', buffering=1 << 20) as file:
+        builder.write(file)
     print(f"Created file {file_path}")
     return file_path
 
@@ -514,18 +827,13 @@ def modify_kicad_sch_file(file_path, components=None, wires=None):
     if wires is None:
         wires = []
 
-    # create empty kicad_sch file
+    # load the existing kicad_sch file
     with open(file_path, 'r') as file:
-        temp_kicad_sch_file = file.read()
+        builder = SchematicBuilder(file.read())
 
     # add each element to kicad_file
-    for component in components:
-        temp_kicad_sch_file = add_component_to_kicad_sch_file(
-            temp_kicad_sch_file, component)
-
-    for wire in wires:
-        temp_kicad_sch_file = add_wire_to_kicad_sch_file(
-            temp_kicad_sch_file, wire)
+    builder.add_elements(components, wires)
+    temp_kicad_sch_file = builder.render()
 
     # save temp file
     with open(file_path, 'w') as file:
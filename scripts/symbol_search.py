@@ -2,13 +2,12 @@ import os
 import re
 import json
 import Levenshtein
-import yaml
+from scripts.config import read_config
 
 config_file_path = 'configuration.yaml'
 
 # Read the YAML file
-with open(config_file_path, 'r') as file:
-    config = yaml.safe_load(file)
+config = read_config(config_file_path)
 
 symbol_library_path = config.get('symbol_library_path', None)
 
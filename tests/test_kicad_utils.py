@@ -0,0 +1,83 @@
+import os
+import re
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEVICE_KICAD_SYM = """(kicad_symbol_lib
+	(version 20231120)
+	(symbol "R"
+		(property "Reference" "R"
+			(at 2.032 0 90)
+		)
+		(property "Value" "R"
+			(at 0 0 90)
+		)
+		(property "Description" "Resistor (small)"
+			(at 0 0 0)
+		)
+		(symbol "R_1_1"
+			(pin passive line (at 0 3.81 270) (number "1"))
+			(pin passive line (at 0 -3.81 90) (number "2"))
+		)
+	)
+)
+"""
+
+UUID_RE = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}')
+
+
+class TestParallelRender(unittest.TestCase):
+    """The pooled rendering path must produce the same schematic as the serial one."""
+
+    def setUp(self):
+        # kicad_utils reads configuration.yaml from the working directory on import,
+        # and so do the spawned workers
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        os.mkdir("lib")
+        with open(os.path.join("lib", "Device.kicad_sym"), "w") as file:
+            file.write(DEVICE_KICAD_SYM)
+        with open("configuration.yaml", "w") as file:
+            file.write(f'symbol_library_path: "{os.path.join(self._tmp.name, "lib")}/"\n')
+        if REPO_ROOT not in sys.path:
+            sys.path.insert(0, REPO_ROOT)
+        sys.modules.pop("scripts.kicad_utils", None)
+        from scripts import kicad_utils
+        self.kicad_utils = kicad_utils
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+        sys.modules.pop("scripts.kicad_utils", None)
+
+    def _render(self, template, components, wires):
+        builder = self.kicad_utils.SchematicBuilder(template)
+        with mock.patch("sys.stdout"):
+            builder.add_elements(components, wires)
+        return builder.render()
+
+    def test_pooled_output_matches_serial(self):
+        components = [{"lib_id": "Device:R", "x": i, "y": 2 * i, "angle": 90 * (i % 2),
+                       "reference_name": f"R{i}"} for i in range(20)]
+        wires = [{"x": i, "y": 0, "end_x": i, "end_y": 5} for i in range(20)]
+        template = self.kicad_utils.create_empty_kicad_sch_template()
+
+        serial = self._render(template, components, wires)
+        with mock.patch.object(self.kicad_utils, "_PARALLEL_THRESHOLD", 0), \
+                mock.patch.object(self.kicad_utils.os, "cpu_count", return_value=4):
+            pooled = self._render(template, components, wires)
+
+        self.assertEqual(UUID_RE.sub("UUID", serial), UUID_RE.sub("UUID", pooled))
+        self.assertEqual(pooled.count('(symbol "Device:R"'), 1)
+        file_uuid = UUID_RE.search(template).group()
+        new_uuids = [u for u in UUID_RE.findall(pooled) if u != file_uuid]
+        self.assertEqual(len(new_uuids), len(set(new_uuids)))
+
+
+if __name__ == "__main__":
+    unittest.main()